@@ -1,4 +1,7 @@
-from __future__ import print_function
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
 
 EXTENDED = 'Ext'
 TRIGGERS = {
@@ -25,284 +28,180 @@ LOCKS = {
 }
 
 
-def to_special_type(column):
-    return int(column)
-
-
-def to_extended(column):
-    return column == EXTENDED
-
-
-def to_trigger_and_only_once(column):
-    return TRIGGERS[column[0]], column[1] == '1'
-
-
 def to_wait(column):
-    if column == '--':
-        return 0.0
-    return float(column.rstrip('s'))
-
-
-def split_chunk(chunk, n_columns):
-    return (line.split(None, n_columns - 1) for line in chunk)
-
-
-def to_bool(column):
-    if column == 'Yes':
-        return True
-    elif column == 'No' or column == '--':
-        return False
+    return 0.0 if column == '--' else float(column[:-1])
+
+
+def interned(table):
+    return {sys.intern(key): value for key, value in table.items()}
+
+
+HEIGHT_FLOOR = '{ to = "Floor" }'
+HEIGHT_FLOOR_8 = '{ to = "Floor", off = 8 }'
+HEIGHT_FLOOR_24 = '{ to = "Floor", off = 24 }'
+HEIGHT_FLOOR_32 = '{ to = "Floor", off = 32 }'
+HEIGHT_NEXT_FLOOR = '{ to = "NextFloor" }'
+HEIGHT_LOWEST_FLOOR = '{ to = "LowestFloor" }'
+HEIGHT_HIGHEST_FLOOR = '{ to = "HighestFloor" }'
+HEIGHT_HIGHEST_FLOOR_8 = '{ to = "HighestFloor", off = 8 }'
+HEIGHT_LOWEST_CEILING = '{ to = "LowestCeiling" }'
+HEIGHT_LOWEST_CEILING_M4 = '{ to = "LowestCeiling", off = -4 }'
+HEIGHT_LOWEST_CEILING_M8 = '{ to = "LowestCeiling", off = -8 }'
+HEIGHT_HIGHEST_CEILING = '{ to = "HighestCeiling" }'
+
+DOOR_CEILINGS = interned({
+    'Open, Wait, Then Close': (HEIGHT_LOWEST_CEILING_M4, HEIGHT_FLOOR, False),
+    'Open and Stay Open': (HEIGHT_LOWEST_CEILING_M4, None, False),
+    'Close and Stay Closed': (HEIGHT_FLOOR, None, False),
+    'Close, Wait, Then Open': (HEIGHT_FLOOR, HEIGHT_LOWEST_CEILING_M4, False),
+})
+
+FIRST_FLOORS = interned({
+    'Absolute 24': (HEIGHT_FLOOR_24, None, False),
+    'Absolute 512': (HEIGHT_FLOOR_24, None, False),
+    'Abs Shortest Lower Texture': None,
+    'None': None,
+    'Highest Neighbor Floor': (HEIGHT_HIGHEST_FLOOR, None, False),
+    'Highest Neighbor Floor + 8': (HEIGHT_HIGHEST_FLOOR_8, None, False),
+    'Lowest Neighbor Ceiling': (HEIGHT_LOWEST_CEILING, None, False),
+    'Lowest Neighbor Ceiling - 8': (HEIGHT_LOWEST_CEILING_M8, None, False),
+    'Lowest Neighbor Floor': (HEIGHT_LOWEST_FLOOR, None, False),
+    'Next Neighbor Floor': (HEIGHT_NEXT_FLOOR, None, False),
+})
+
+FIRST_CEILINGS = interned({
+    '8 Above Floor': (HEIGHT_FLOOR_8, None, False),
+    'Floor': (HEIGHT_FLOOR, None, False),
+    'Highest Neighbor Ceiling': (HEIGHT_HIGHEST_CEILING, None, False),
+    'Highest Neighbor Floor': (HEIGHT_HIGHEST_FLOOR, None, False),
+    'Lowest Neighbor Ceiling': (HEIGHT_LOWEST_CEILING, None, False),
+})
+
+PLATFORM_FLOORS = interned({
+    'Ceiling (toggle)': None,
+    'Lowest and Highest Floor (perpetual)': (HEIGHT_LOWEST_FLOOR,
+                                             HEIGHT_HIGHEST_FLOOR, True),
+    'Lowest Neighbor Floor (lift)': (HEIGHT_LOWEST_FLOOR, HEIGHT_FLOOR, False),
+    'Raise 24 Units': (HEIGHT_FLOOR_24, None, False),
+    'Raise 32 Units': (HEIGHT_FLOOR_32, None, False),
+    'Raise Next Floor': (HEIGHT_NEXT_FLOOR, None, False),
+    'Stop': None,
+})
+
+EXITS = interned({
+    'Normal': ('"Normal"', None, False),
+    'Secret': ('"Secret"', None, False),
+})
+
+
+# (name, block index in tables.txt, number of columns, column spec). Blocks
+# 4-7 (crushers, stairs, elevators, lighting) and 9 onwards are not emitted.
+SECTIONS = [
+    ('Doors', 0, 8, {
+        'lock_col': 3, 'speed_col': 4, 'wait_col': 5, 'monsters_col': 6,
+        'lookup_col': 7, 'table': DOOR_CEILINGS, 'kind': 'ceiling',
+    }),
+    ('Floors', 1, 10, {
+        'speed_col': 4, 'monsters_col': 7,
+        'lookup_col': 9, 'table': FIRST_FLOORS, 'kind': 'floor',
+    }),
+    ('Ceilings', 2, 10, {
+        'speed_col': 4, 'monsters_col': 7,
+        'lookup_col': 9, 'table': FIRST_CEILINGS, 'kind': 'ceiling',
+    }),
+    ('Platforms', 3, 9, {
+        'wait_col': 3, 'speed_col': 4, 'monsters_col': 7,
+        'lookup_col': 8, 'table': PLATFORM_FLOORS, 'kind': 'floor',
+    }),
+    ('Exits', 8, 4, {
+        'lookup_col': 3, 'table': EXITS, 'kind': 'exit',
+    }),
+]
+
+
+@lru_cache(maxsize=None)
+def template(kind, flags):
+    (extended, only_once, monsters,
+     has_lock, has_wait, has_speed, repeat, single) = flags
+    parts = ['[[linedef]]\n',
+             '  special_type = %(special_type)d\n',
+             '  trigger = %(trigger)s\n']
+    if extended:
+        parts.append('  extended = true\n')
+    if only_once:
+        parts.append('  only_once = true\n')
+    if monsters:
+        parts.append('  monsters = true\n')
+    if has_lock:
+        parts.append('  lock = %(lock)d\n')
+    if kind == 'exit':
+        parts.append('  exit =  %(first)s\n')
     else:
-        assert False, column
-
-
-def height(ref, off=None):
-    string = '{ to = "%s"' % (ref,)
-    if off is not None:
-        return string + ', off = %d }' % (off,)
-    else:
-        return string + ' }'
-
-
-def doors(chunk):
-    open_door = height('LowestCeiling', -4)
-    close_door = height('Floor')
-
-    ceilings = {
-        'Open, Wait, Then Close': (open_door, close_door),
-        'Open and Stay Open': (open_door, None),
-        'Close and Stay Closed': (close_door, None),
-        'Close, Wait, Then Open': (close_door, open_door),
-    }
-
-    print()
-    print()
-    print('### Doors ###')
-    print()
-    for row in split_chunk(chunk, 8):
-        special_type = to_special_type(row[0])
-        extended = to_extended(row[1])
-        trigger, only_once = to_trigger_and_only_once(row[2])
-        lock = LOCKS[row[3]]
-        speed = SPEEDS[row[4]]
-        wait = to_wait(row[5])
-        monsters = to_bool(row[6])
-
-        first, second = ceilings[row[7]]
-        print('[[linedef]]')
-        print('  special_type =', special_type)
-        print('  trigger =', trigger)
-        if extended:
-            print('  extended = true')
-        if only_once:
-            print('  only_once = true')
-        if monsters:
-            print('  monsters = true')
-        if lock is not None:
-            print('  lock =', lock)
-        print('  [linedef.move]')
-        if wait > 0.0:
-            print('    wait =', wait)
-        if speed > 0.0:
-            print('    speed =', speed)
-        if second is None:
-            print('    ceiling = { first =', first, '}')
-        else:
-            print('    [linedef.move.ceiling]')
-            print('      first =', first)
-            print('      second =', second)
-        print()
-
-
-def floors(chunk):
-    first_floors = {
-        'Absolute 24': height('Floor', 24),
-        'Absolute 512': height('Floor', 24),
-        'Abs Shortest Lower Texture': None,
-        'None': None,
-        'Highest Neighbor Floor': height('HighestFloor'),
-        'Highest Neighbor Floor + 8': height('HighestFloor', 8),
-        'Lowest Neighbor Ceiling': height('LowestCeiling'),
-        'Lowest Neighbor Ceiling - 8': height('LowestCeiling', - 8),
-        'Lowest Neighbor Floor': height('LowestFloor'),
-        'Next Neighbor Floor': height('NextFloor'),
-    }
-
-    print()
-    print()
-    print('### Floors ###')
-    print()
-    for row in split_chunk(chunk, 10):
-        special_type = to_special_type(row[0])
-        extended = to_extended(row[1])
-        trigger, only_once = to_trigger_and_only_once(row[2])
-        speed = SPEEDS[row[4]]
-        monsters = to_bool(row[7])
-
-        first_floor = first_floors[row[9]]
-        if first_floor is None:
-            continue
-
-        print('[[linedef]]')
-        print('  special_type =', special_type)
-        print('  trigger =', trigger)
-        if extended:
-            print('  extended = true')
-        if only_once:
-            print('  only_once = true')
-        if monsters:
-            print('  monsters = true')
-        print('  [linedef.move]')
-        if speed > 0.0:
-            print('    speed =', speed)
-        print('    floor = { first =', first_floor, '}')
-        print()
-
-
-def ceilings(chunk):
-    first_ceilings = {
-        '8 Above Floor': height('Floor', 8),
-        'Floor': height('Floor'),
-        'Highest Neighbor Ceiling': height('HighestCeiling'),
-        'Highest Neighbor Floor': height('HighestFloor'),
-        'Lowest Neighbor Ceiling': height('LowestCeiling'),
-    }
-
-    print()
-    print()
-    print('### Ceilings ###')
-    print()
-    for row in split_chunk(chunk, 10):
-        special_type = to_special_type(row[0])
-        extended = to_extended(row[1])
-        trigger, only_once = to_trigger_and_only_once(row[2])
-        speed = SPEEDS[row[4]]
-        monsters = to_bool(row[7])
-        first_ceiling = first_ceilings[row[9]]
-
-        print('[[linedef]]')
-        print('  special_type =', special_type)
-        print('  trigger =', trigger)
-        if extended:
-            print('  extended = true')
-        if only_once:
-            print('  only_once = true')
-        if monsters:
-            print('  monsters = true')
-        print('  [linedef.move]')
-        if speed > 0.0:
-            print('    speed =', speed)
-        print('    ceiling = { first =', first_ceiling, '}')
-        print()
-
-
-def platforms(chunk):
-    floors = {
-        'Ceiling (toggle)': None,
-        'Lowest and Highest Floor (perpetual)': (height('LowestFloor'),
-                                                 height('HighestFloor'),
-                                                 True),
-        'Lowest Neighbor Floor (lift)': (height('LowestFloor'),
-                                         height('Floor'), False),
-        'Raise 24 Units': (height('Floor', 24), None, False),
-        'Raise 32 Units': (height('Floor', 32), None, False),
-        'Raise Next Floor': (height('NextFloor'), None, False),
-        'Stop': None,
-    }
-
-    print()
-    print()
-    print('### Platforms ###')
-    print()
-    for row in split_chunk(chunk, 9):
-        special_type = to_special_type(row[0])
-        extended = to_extended(row[1])
-        trigger, only_once = to_trigger_and_only_once(row[2])
-        wait = to_wait(row[3])
-        speed = SPEEDS[row[4]]
-        monsters = to_bool(row[7])
-
-        triple = floors[row[8]]
-        if triple is None:
-            continue
-
-        first, second, repeat = triple
-        print('[[linedef]]')
-        print('  special_type =', special_type)
-        print('  trigger =', trigger)
-        if extended:
-            print('  extended = true')
-        if only_once:
-            print('  only_once = true')
-        if monsters:
-            print('  monsters = true')
-        print('  [linedef.move]')
-        if wait > 0.0:
-            print('    wait =', wait)
-        if speed > 0.0:
-            print('    speed =', speed)
+        parts.append('  [linedef.move]\n')
+        if has_wait:
+            parts.append('    wait = %(wait)s\n')
+        if has_speed:
+            parts.append('    speed = %(speed)d\n')
         if repeat:
-            print('    repeat = true')
-        if second is None:
-            print('    floor = { first =', first, '}')
+            parts.append('    repeat = true\n')
+        if single:
+            parts.append('    %s = { first = %%(first)s }\n' % (kind,))
         else:
-            print('    [linedef.move.floor]')
-            print('      first =', first)
-            print('      second =', second)
-        print()
-
-
-def exits(chunk):
-    exits = {
-        'Normal': '"Normal"',
-        'Secret': '"Secret"',
-    }
-
-    print()
-    print()
-    print('### Exits ###')
-    print()
-    for row in split_chunk(chunk, 4):
-        special_type = to_special_type(row[0])
-        extended = to_extended(row[1])
-        trigger, only_once = to_trigger_and_only_once(row[2])
-        exit = exits[row[3]]
+            parts.append('    [linedef.move.%s]\n' % (kind,))
+            parts.append('      first = %(first)s\n')
+            parts.append('      second = %(second)s\n')
+    parts.append('\n')
+    return ''.join(parts)
+
+
+def emit(name, n_columns, spec, chunk, w):
+    kind = spec['kind']
+    table = spec['table']
+    lookup_col = spec['lookup_col']
+    lock_col = spec.get('lock_col')
+    speed_col = spec.get('speed_col')
+    wait_col = spec.get('wait_col')
+    monsters_col = spec.get('monsters_col')
+
+    w('\n\n### %s ###\n\n' % (name,))
+    for line in chunk:
+        row = line.split(None, n_columns - 1)
+        move = table[sys.intern(row[lookup_col])]
+        if move is None:
+            continue
 
-        print('[[linedef]]')
-        print('  special_type =', special_type)
-        print('  trigger =', trigger)
-        if extended:
-            print('  extended = true')
-        if only_once:
-            print('  only_once = true')
-        print('  exit = ', exit)
-        print()
+        first, second, repeat = move
+        trg = row[2]
+        lock = LOCKS[row[lock_col]] if lock_col is not None else None
+        speed = SPEEDS[row[speed_col]] if speed_col is not None else 0
+        wait = to_wait(row[wait_col]) if wait_col is not None else 0.0
+        monsters = monsters_col is not None and row[monsters_col] == 'Yes'
+
+        flags = (row[1] == EXTENDED, trg[1] == '1', monsters,
+                 lock is not None, wait > 0.0, speed > 0, repeat,
+                 second is None)
+        w(template(kind, flags) % {
+            'special_type': int(row[0]),
+            'trigger': TRIGGERS[trg[0]],
+            'lock': lock,
+            'wait': wait,
+            'speed': speed,
+            'first': first,
+            'second': second,
+        })
 
 
 def main():
-    lines = [line.strip() for line in open('tables.txt', 'r')]
-
-    def gen_chunks():
-        chunk = []
-        for line in lines:
-            if line:
-                chunk.append(line)
-            else:
-                yield chunk
-                chunk = []
-
-    chunks = gen_chunks()
-    doors(next(chunks))
-    floors(next(chunks))
-    ceilings(next(chunks))
-    platforms(next(chunks))
-    next(chunks)  # crusher_ceilings(next(chunks))
-    next(chunks)  # stair_builders(next(chunks))
-    next(chunks)  # elevators(next(chunks))
-    next(chunks)  # lighting(next(chunks))
-    exits(next(chunks))
-    next(chunks)  # teleporters(next(chunks))
-    next(chunks)  # donuts(next(chunks))
+    out = []
+    w = out.append
+    text = Path('tables.txt').read_text()
+    text = re.sub(r'[ \t]+$', '', text, flags=re.M).strip()
+    # Only the first nine blocks are looked at; leave the rest unsplit.
+    blocks = re.split(r'\n{2,}', text, maxsplit=9)
+
+    for name, block, n_columns, spec in SECTIONS:
+        emit(name, n_columns, spec, blocks[block].splitlines(), w)
+    sys.stdout.write(''.join(out))
 
 
 if __name__ == '__main__':